@@ -9,6 +9,17 @@ import numpy as np
 from sympy import Matrix, nsimplify
 import warnings
 
+# Try to import the jit from numba.  If it is
+# not available, just go with the standard
+# python interpreter
+try:
+    from numba import jit
+except ImportError:
+
+    def jit(fn):
+        return fn
+
+
 from .material import Material, material_property, cached_property
 from .mineral import Mineral
 from .solution import Solution
@@ -19,6 +30,23 @@ from ..utils.chemistry import sum_formulae, sort_element_list_to_IUPAC_order
 from ..utils.chemistry import reaction_matrix_as_strings
 
 
+@jit
+def _apply_component_factor(pseudoinverse, stoichiometric_array_T, b):
+    """
+    Applies a precomputed pseudoinverse of the transposed
+    stoichiometric array to a stacked set of component compositions,
+    returning the minimum-norm least squares proportions and their
+    residuals. Split out as a module-level function so that numba can
+    compile the dense linear algebra, which may be called repeatedly
+    from inner optimization loops.
+    """
+    p = np.dot(pseudoinverse, b)
+
+    res = np.abs(np.dot(stoichiometric_array_T, p) - b).T
+    res = np.sum(res, axis=1)
+    return p, res
+
+
 def check_pairs(phases, fractions):
     if len(fractions) < 1:
         raise Exception("ERROR: we need at least one phase")
@@ -512,20 +540,36 @@ class Composite(Material):
         components: list of dictionaries
             List of formulae of the components.
         """
+        # The set of phases in a composite is fixed, so if the same
+        # components have already been set (as happens on every iteration
+        # of an optimization loop), the transformation does not need
+        # to be recomputed.
+        component_key = tuple(
+            tuple(sorted(component.items())) for component in components
+        )
+        if getattr(self, "_component_key", None) == component_key:
+            return
+
         # Convert components into array form
         b = np.array(
             [
                 [component[el] if el in component else 0.0 for component in components]
                 for el in self.elements
-            ]
+            ],
+            dtype=float,
         )
 
         # Solve to find a set of endmember proportions that
-        # satisfy each of the component formulae
-        p = np.linalg.lstsq(self.stoichiometric_array.T, b, rcond=None)
+        # satisfy each of the component formulae. The factorization of
+        # the stoichiometric array is cached per composite, so each new
+        # component set only costs a matrix product; stacking the
+        # components in b amortizes that product across all of them.
+        component_array, res = _apply_component_factor(
+            self._stoichiometric_pseudoinverse,
+            np.ascontiguousarray(self.stoichiometric_array.T),
+            b,
+        )
 
-        res = np.abs((self.stoichiometric_array.T.dot(p[0]) - b).T)
-        res = np.sum(res, axis=1)
         # Check that all components can be described by linear sums of
         # the endmembers
         if not np.all(res < 1.0e-12):
@@ -536,7 +580,8 @@ class Composite(Material):
             )
 
         self.components = components
-        self.component_array = p[0]
+        self.component_array = component_array
+        self._component_key = component_key
 
     def chemical_potential(self, components=None):
         """
@@ -614,6 +659,15 @@ class Composite(Material):
         """
         return np.array(self.stoichiometric_matrix).astype(float)
 
+    @cached_property
+    def _stoichiometric_pseudoinverse(self):
+        """
+        The Moore-Penrose pseudoinverse of the transposed
+        stoichiometric array, used to convert component compositions
+        into endmember proportions in set_components.
+        """
+        return np.linalg.pinv(self.stoichiometric_array.T)
+
     @cached_property
     def reaction_basis(self):
         """
@@ -7,8 +7,10 @@
 
 from __future__ import absolute_import
 import numpy as np
+from scipy.interpolate import RegularGridInterpolator
 from scipy.optimize import fsolve
 import itertools
+import warnings
 from sympy import Rational
 
 from .. import constants
@@ -21,6 +23,76 @@ from ..utils.chemistry import compositional_array
 from ..utils.chemistry import reaction_matrix_as_strings
 
 
+def _set_state_if_changed(mineral, pressure, temperature):
+    """
+    Calls mineral.set_state only if the mineral is not already at the
+    requested state. This avoids duplicate EOS evaluations when the
+    same mineral appears in more than one reaction list, or when a
+    solver revisits a state.
+    """
+    if mineral.pressure != pressure or mineral.temperature != temperature:
+        mineral.set_state(pressure, temperature)
+
+
+def _relaxed_log_step(step, x):
+    """
+    Bounds a proposed step in ln(x) so that no iterate changes x by
+    more than a factor of ~exp(max_step) at a time. The bound scales
+    with the magnitude of ln(x) (Gordon-McBride-style
+    under-relaxation), which damps oscillations without slowing
+    convergence for well-scaled problems.
+    """
+    max_step = max(0.5 * abs(np.log(x)), 0.5)
+    if abs(step) > max_step:
+        return np.copysign(max_step, step), True
+    return step, False
+
+
+def _newton_steffensen(f, fprime, x0, tol, max_iterations=50):
+    """
+    Finds the root of a scalar function of a positive variable using
+    a third-order Newton-Steffensen iteration on u = ln(x):
+    a provisional step u* = u - f/(f'(x)*x) is corrected to
+    u_new = u - f^2 / (f'(x)*x * (f - f(x*))),
+    reusing the same Jacobian evaluation for both stages.
+    Working in ln(x) keeps the iterates positive by construction, and
+    steps are under-relaxed to prevent overshoot far from the root
+    (when a step has been clamped, the Steffensen correction no
+    longer applies and the relaxed Newton step is used directly).
+    Returns the root estimate and whether the iteration converged;
+    callers are expected to fall back to a more robust solver
+    on failure.
+    """
+    x = x0
+    fx = f(x)
+    for _ in range(max_iterations):
+        if abs(fx) < tol:
+            return x, True
+
+        dfdu = fprime(x) * x
+        if dfdu == 0.0:
+            return x, False
+
+        newton_step, clamped = _relaxed_log_step(-fx / dfdu, x)
+        x_star = x * np.exp(newton_step)
+        f_star = f(x_star)
+
+        denominator = dfdu * (fx - f_star)
+        if clamped or denominator == 0.0:
+            x_new, f_new = x_star, f_star
+        else:
+            step, _ = _relaxed_log_step(-fx * fx / denominator, x)
+            x_new = x * np.exp(step)
+            f_new = f(x_new)
+
+        # Treat a growing residual as divergence
+        if abs(f_new) > abs(fx):
+            return x, False
+        x, fx = x_new, f_new
+
+    return x, abs(fx) < tol
+
+
 def fugacity(standard_material, assemblage):
     """
     Parameters
@@ -110,14 +182,56 @@ def equilibrium_pressure(
         The equilibrium pressure of the reaction [Pa]
     """
 
-    def eqm(P, T):
-        gibbs = 0.0
-        for i, mineral in enumerate(minerals):
-            mineral.set_state(P[0], T)
-            gibbs = gibbs + mineral.gibbs * stoichiometry[i]
-        return gibbs
+    # The Gibbs energy of reaction and its pressure derivative
+    # (the volume of reaction) come from the same set_state pass,
+    # memoized in case fsolve revisits a pressure.
+    cache = {}
+    n_minerals = len(minerals)
+    stoichiometric_amounts = np.asarray(stoichiometry, dtype=float)
+
+    def _evaluate(P, T):
+        key = (P, T)
+        if key not in cache:
+            for mineral in minerals:
+                _set_state_if_changed(mineral, P, T)
+            gibbs = np.fromiter(
+                (mineral.gibbs for mineral in minerals), float, count=n_minerals
+            )
+            volumes = np.fromiter(
+                (mineral.V for mineral in minerals), float, count=n_minerals
+            )
+            cache[key] = (
+                float(np.dot(stoichiometric_amounts, gibbs)),
+                float(np.dot(stoichiometric_amounts, volumes)),
+            )
+        return cache[key]
 
-    pressure = fsolve(eqm, [pressure_initial_guess], args=(temperature))[0]
+    def eqm(P, T):
+        return _evaluate(P[0], T)[0]
+
+    def eqm_jacobian(P, T):
+        # dG/dP = V
+        return [[_evaluate(P[0], T)[1]]]
+
+    # The Newton-Steffensen iteration typically converges in a
+    # handful of residual evaluations; the evaluation cache lets the
+    # fsolve fallback reuse them if the iteration diverges.
+    pressure, converged = _newton_steffensen(
+        lambda P: _evaluate(P, temperature)[0],
+        lambda P: _evaluate(P, temperature)[1],
+        pressure_initial_guess,
+        tol=1.0e-8,
+    )
+    if not converged:
+        pressure = fsolve(
+            eqm,
+            [pressure_initial_guess],
+            args=(temperature),
+            fprime=eqm_jacobian,
+            xtol=1.0e-10,
+            diag=[1.0e-9],
+            factor=1.0,
+        )[0]
 
     return pressure
 
@@ -151,14 +265,55 @@ def equilibrium_temperature(
         The equilibrium temperature of the reaction [K]
     """
 
-    def eqm(T, P):
-        gibbs = 0.0
-        for i, mineral in enumerate(minerals):
-            mineral.set_state(P, T[0])
-            gibbs = gibbs + mineral.gibbs * stoichiometry[i]
-        return gibbs
+    # As in equilibrium_pressure, the Gibbs energy of reaction and its
+    # temperature derivative (minus the entropy of reaction) come from
+    # the same memoized set_state pass.
+    cache = {}
+    n_minerals = len(minerals)
+    stoichiometric_amounts = np.asarray(stoichiometry, dtype=float)
+
+    def _evaluate(T, P):
+        key = (T, P)
+        if key not in cache:
+            for mineral in minerals:
+                _set_state_if_changed(mineral, P, T)
+            gibbs = np.fromiter(
+                (mineral.gibbs for mineral in minerals), float, count=n_minerals
+            )
+            entropies = np.fromiter(
+                (mineral.S for mineral in minerals), float, count=n_minerals
+            )
+            cache[key] = (
+                float(np.dot(stoichiometric_amounts, gibbs)),
+                -float(np.dot(stoichiometric_amounts, entropies)),
+            )
+        return cache[key]
 
-    temperature = fsolve(eqm, [temperature_initial_guess], args=(pressure))[0]
+    def eqm(T, P):
+        return _evaluate(T[0], P)[0]
+
+    def eqm_jacobian(T, P):
+        # dG/dT = -S
+        return [[_evaluate(T[0], P)[1]]]
+
+    # As in equilibrium_pressure, try the fast Newton-Steffensen
+    # iteration first and fall back to fsolve if it diverges.
+    temperature, converged = _newton_steffensen(
+        lambda T: _evaluate(T, pressure)[0],
+        lambda T: _evaluate(T, pressure)[1],
+        temperature_initial_guess,
+        tol=1.0e-8,
+    )
+    if not converged:
+        temperature = fsolve(
+            eqm,
+            [temperature_initial_guess],
+            args=(pressure),
+            fprime=eqm_jacobian,
+            xtol=1.0e-10,
+            diag=[1.0e-3],
+            factor=1.0,
+        )[0]
 
     return temperature
 
@@ -196,23 +351,334 @@ def invariant_point(
         The equilibrium temperature of the reaction [K]
     """
 
+    # The Gibbs energies of the two reactions and their analytic
+    # (P, T) derivatives (V, -S) come from the same set_state pass,
+    # memoized in case fsolve revisits a state.
+    stoich_r1 = np.asarray(stoichiometry_r1, dtype=np.float64)
+    stoich_r2 = np.asarray(stoichiometry_r2, dtype=np.float64)
+
+    # Minerals shared between the two reactions (a common occurrence at
+    # invariant points) only have their state set and their properties
+    # read once per (P, T).
+    unique_minerals = list(
+        {id(m): m for m in list(minerals_r1) + list(minerals_r2)}.values()
+    )
+    positions = {id(m): j for j, m in enumerate(unique_minerals)}
+    idx_r1 = np.array([positions[id(m)] for m in minerals_r1])
+    idx_r2 = np.array([positions[id(m)] for m in minerals_r2])
+    n_unique = len(unique_minerals)
+    cache = {}
+
+    def _evaluate(P, T):
+        key = (P, T)
+        if key not in cache:
+            for mineral in unique_minerals:
+                _set_state_if_changed(mineral, P, T)
+            gibbs = np.fromiter(
+                (m.gibbs for m in unique_minerals), dtype=np.float64, count=n_unique
+            )
+            volume = np.fromiter(
+                (m.V for m in unique_minerals), dtype=np.float64, count=n_unique
+            )
+            entropy = np.fromiter(
+                (m.S for m in unique_minerals), dtype=np.float64, count=n_unique
+            )
+            cache[key] = [
+                (
+                    np.dot(stoich_r, gibbs[idx_r]),
+                    np.dot(stoich_r, volume[idx_r]),
+                    -np.dot(stoich_r, entropy[idx_r]),
+                )
+                for stoich_r, idx_r in ((stoich_r1, idx_r1), (stoich_r2, idx_r2))
+            ]
+        return cache[key]
+
     def eqm(PT):
-        P, T = PT
-        gibbs_r1 = 0.0
-        for i, mineral in enumerate(minerals_r1):
-            mineral.set_state(P, T)
-            gibbs_r1 = gibbs_r1 + mineral.gibbs * stoichiometry_r1[i]
-        gibbs_r2 = 0.0
-        for i, mineral in enumerate(minerals_r2):
-            mineral.set_state(P, T)
-            gibbs_r2 = gibbs_r2 + mineral.gibbs * stoichiometry_r2[i]
-        return [gibbs_r1, gibbs_r2]
-
-    pressure, temperature = fsolve(eqm, pressure_temperature_initial_guess)
+        r1, r2 = _evaluate(PT[0], PT[1])
+        return [r1[0], r2[0]]
+
+    def eqm_jacobian(PT):
+        # dG/dP = V, dG/dT = -S for each reaction
+        r1, r2 = _evaluate(PT[0], PT[1])
+        return [[r1[1], r1[2]], [r2[1], r2[2]]]
+
+    # P and T differ by ~6 orders of magnitude, so tell MINPACK the
+    # variable scales explicitly (diag entries are multiplicative,
+    # bringing both scaled variables to order 1) rather than letting
+    # hybrj infer them from the initial guess.
+    pressure, temperature = fsolve(
+        eqm,
+        pressure_temperature_initial_guess,
+        fprime=eqm_jacobian,
+        xtol=1.0e-10,
+        diag=[1.0e-9, 1.0e-3],
+        factor=1.0,
+    )
     return pressure, temperature
 
 
-def hugoniot(mineral, P_ref, T_ref, pressures, reference_mineral=None):
+def hugoniot_property_table(
+    mineral, pressure_bounds, temperature_bounds, n_pressures=201, n_temperatures=101
+):
+    """
+    Precomputes a regular (P, T) interpolation table of the properties
+    needed by the Hugoniot solver (helmholtz, S, V, C_p, alpha).
+    Building the table costs one full EOS evaluation per grid node,
+    after which each solver iteration only pays for bilinear
+    interpolation, which is much cheaper than an EOS inversion. The
+    table can be reused across hugoniot calls as long as the mineral's
+    parameters do not change, and is only appropriate where the
+    properties are smooth, i.e. away from phase transitions. The
+    bounds only need to cover the expected solutions, not every
+    intermediate iterate: transient overshoot is clamped to the table
+    edges, while points whose pressure lies outside the table, or
+    whose converged temperature does, are re-solved against the full
+    equation of state (edge-clamped properties extrapolate the
+    energy balance rather than rejecting such points, so the solver
+    checks the ranges explicitly instead of relying on the
+    convergence test).
+
+    Parameters
+    ----------
+    mineral : mineral
+        Mineral to tabulate.
+
+    pressure_bounds : list of two floats
+        Minimum and maximum tabulated pressures [Pa]
+
+    temperature_bounds : list of two floats
+        Minimum and maximum tabulated temperatures [K]
+
+    n_pressures : optional integer
+        Number of pressure nodes
+
+    n_temperatures : optional integer
+        Number of temperature nodes
+
+    Returns
+    -------
+    table : scipy.interpolate.RegularGridInterpolator
+        Interpolator suitable for the property_table argument of
+        :func:`hugoniot`.
+    """
+    pressure_nodes = np.linspace(pressure_bounds[0], pressure_bounds[1], n_pressures)
+    temperature_nodes = np.linspace(
+        temperature_bounds[0], temperature_bounds[1], n_temperatures
+    )
+    pressure_grid, temperature_grid = np.meshgrid(
+        pressure_nodes, temperature_nodes, indexing="ij"
+    )
+    properties = mineral.evaluate(
+        ["helmholtz", "S", "V", "C_p", "alpha"], pressure_grid, temperature_grid
+    )
+    # bounds_error is disabled because intermediate Newton iterates
+    # may transiently overshoot the grid even when every converged
+    # solution lies inside it; the solver clamps such queries to the
+    # table edges and explicitly re-solves any point whose pressure
+    # or converged temperature is out of range with the full EOS.
+    return RegularGridInterpolator(
+        (pressure_nodes, temperature_nodes),
+        np.moveaxis(properties, 0, -1),
+        bounds_error=False,
+    )
+
+
+def _hugoniot_newton(
+    mineral,
+    pressures,
+    T_guess,
+    P_ref,
+    U_ref,
+    V_ref,
+    tol=1.0e-12,
+    max_iterations=30,
+    property_table=None,
+):
+    """
+    Solves the Hugoniot energy balance
+    (U - U_ref) - 0.5*(P - P_ref)*(V_ref - V) = 0
+    for the temperatures (and corresponding volumes)
+    at all the given pressures simultaneously,
+    using a Newton iteration with the analytic temperature derivative
+    dU/dT|_P + 0.5*(P - P_ref)*dV/dT|_P = C_p - 0.5*(P + P_ref)*alpha*V.
+    Each iteration makes one property-gathering pass over the points
+    that have not yet converged and then updates all of their
+    temperatures with vectorized numpy operations, so the Python-level
+    solver overhead is amortized across the whole pressure sweep.
+
+    The Newton step is taken in ln(T), so the iterates stay positive
+    by construction, and is bounded to half a log unit per iteration:
+    walking up from the reference temperature in bounded steps finds
+    the same (lowest) root that the previous fsolve implementation
+    did, whereas an unrelaxed step can overshoot onto a spurious
+    high-temperature root of the energy balance. Points whose
+    residual grows or becomes non-finite, and points that do not
+    converge within max_iterations, are returned in the third output
+    for the caller to re-solve with a more robust method; they are
+    never silently retired as converged.
+
+    When interpolating from a property table, a residual built from
+    edge-clamped properties still has a (linearly extrapolated) root
+    beyond the table, so the convergence test alone cannot reject
+    out-of-range solutions. Points whose pressure lies outside the
+    table are therefore returned as unconverged up front, and points
+    whose converged temperature lies outside it are moved back to the
+    unconverged set after the iteration.
+
+    The sweep is embarrassingly parallel over pressures, but it is not
+    compiled with numba.prange: every residual evaluation goes through
+    mineral.set_state and the Material property machinery, which are
+    ordinary Python objects, so a nopython kernel would have to drop
+    back to object mode around each EOS call and the GIL would
+    serialize the loop anyway. If the EOS evaluations ever become
+    callable in nopython mode, the property-gathering pass is the
+    piece to move into a parallel kernel.
+    """
+    pressures = np.asarray(pressures, dtype=float)
+    temperatures = np.full_like(pressures, T_guess)
+    volumes = np.full_like(pressures, np.nan)
+    energy_tolerance = tol * max(abs(U_ref), 1.0)
+
+    active = np.arange(len(pressures))
+    failed = np.empty(0, dtype=int)
+    if property_table is not None:
+        # Pressures outside the table cannot be solved from clamped
+        # edge properties; route them straight to the fallback.
+        P_nodes, T_nodes = property_table.grid
+        in_range = (pressures >= P_nodes[0]) & (pressures <= P_nodes[-1])
+        failed = active[~in_range]
+        active = active[in_range]
+    previous_residuals = np.full_like(pressures, np.inf)
+    for _ in range(max_iterations):
+        if len(active) == 0:
+            break
+        P_active = pressures[active]
+        T_active = temperatures[active]
+        if property_table is None:
+            helmholtz, S, V, C_p, alpha = mineral.evaluate(
+                ["helmholtz", "S", "V", "C_p", "alpha"], P_active, T_active
+            )
+        else:
+            # Clamp transient overshoot to the table edges; whether
+            # each point's solution actually lies inside the table is
+            # checked explicitly outside the loop.
+            helmholtz, S, V, C_p, alpha = property_table(
+                np.column_stack(
+                    (
+                        np.clip(P_active, P_nodes[0], P_nodes[-1]),
+                        np.clip(T_active, T_nodes[0], T_nodes[-1]),
+                    )
+                )
+            ).T
+        U = helmholtz + T_active * S
+        dEdT = C_p - 0.5 * (P_active + P_ref) * alpha * V
+
+        # V always matches the temperature at which the residual was
+        # last evaluated, so converged points retire with a consistent
+        # (T, V) pair and no final refill pass is needed.
+        volumes[active] = V
+        delta_E = (U - U_ref) - 0.5 * (P_active - P_ref) * (V_ref - V)
+
+        # A non-finite or growing residual means the iteration has
+        # left the basin of the physical root; hand those points back
+        # to the caller instead of letting the NaN comparison below
+        # retire them as converged (np.abs(nan) >= tol is False).
+        healthy = (
+            np.isfinite(delta_E)
+            & np.isfinite(dEdT)
+            & (dEdT != 0.0)
+            & (np.abs(delta_E) <= previous_residuals[active])
+        )
+        failed = np.concatenate((failed, active[~healthy]))
+        previous_residuals[active] = np.abs(delta_E)
+        unconverged = healthy & (np.abs(delta_E) >= energy_tolerance)
+        if not unconverged.any():
+            active = active[:0]
+            break
+        log_steps = -(delta_E / (dEdT * T_active))[unconverged]
+        active = active[unconverged]
+        temperatures[active] *= np.exp(np.clip(log_steps, -0.5, 0.5))
+
+    unconverged_points = np.concatenate((failed, active))
+    if property_table is not None:
+        # A temperature that converged onto the clamped edge residual
+        # is an extrapolation, not a table solution; re-solve it too.
+        converged = np.setdiff1d(np.arange(len(pressures)), unconverged_points)
+        out_of_table = converged[
+            (temperatures[converged] < T_nodes[0])
+            | (temperatures[converged] > T_nodes[-1])
+        ]
+        unconverged_points = np.concatenate((unconverged_points, out_of_table))
+    return temperatures, volumes, np.sort(unconverged_points)
+
+
+def _hugoniot_fallback(
+    mineral, pressures, temperatures, volumes, unconverged, T_ref, P_ref, U_ref, V_ref
+):
+    """
+    Re-solves the Hugoniot points that the batched Newton solver could
+    not converge, one at a time with fsolve against the full equation
+    of state. The points are visited in order of increasing pressure
+    and each is warm-started from the temperature of the nearest
+    already-converged pressure, continuing the solution along the
+    Hugoniot rather than restarting from the reference temperature.
+    Points that still fail are returned as NaN with a warning.
+    """
+
+    def Ediff(T, P):
+        mineral.set_state(P, T[0])
+        U = mineral.helmholtz + T[0] * mineral.S
+        return (U - U_ref) - 0.5 * (P - P_ref) * (V_ref - mineral.V)
+
+    def Ediff_jacobian(T, P):
+        mineral.set_state(P, T[0])
+        return [[mineral.C_p - 0.5 * (P + P_ref) * mineral.alpha * mineral.V]]
+
+    converged = np.ones(len(pressures), dtype=bool)
+    converged[unconverged] = False
+    for i in unconverged[np.argsort(pressures[unconverged])]:
+        if converged.any():
+            candidates = np.flatnonzero(converged)
+            nearest = candidates[
+                np.argmin(np.abs(pressures[candidates] - pressures[i]))
+            ]
+            T_start = temperatures[nearest]
+        else:
+            T_start = T_ref
+
+        solution, _, ier, message = fsolve(
+            Ediff,
+            [T_start],
+            args=(pressures[i]),
+            fprime=Ediff_jacobian,
+            full_output=True,
+        )
+        if ier == 1:
+            temperatures[i] = solution[0]
+            mineral.set_state(pressures[i], solution[0])
+            volumes[i] = mineral.V
+            converged[i] = True
+        else:
+            temperatures[i] = np.nan
+            volumes[i] = np.nan
+            warnings.warn(
+                "The Hugoniot energy balance could not be solved at "
+                f"{pressures[i]:.4e} Pa: {message}"
+            )
+
+    return temperatures, volumes
+
+
+def hugoniot(
+    mineral,
+    P_ref,
+    T_ref,
+    pressures,
+    reference_mineral=None,
+    property_table=None,
+    U_ref=None,
+    V_ref=None,
+):
     """
     Calculates the temperatures (and volumes) along a Hugoniot
     as a function of pressure according to the Hugoniot equation
@@ -241,37 +707,63 @@ def hugoniot(mineral, P_ref, T_ref, pressures, reference_mineral=None):
         mineral transforms to the mineral of interest at some
         (unspecified) pressure.
 
+    property_table : optional scipy.interpolate.RegularGridInterpolator
+        Precomputed property table from
+        :func:`hugoniot_property_table`. When given, the solver
+        interpolates the mineral properties from the table instead of
+        evaluating the full equation of state at every iteration.
+        Intended for dense pressure sweeps or repeated calls over
+        smooth regions of the equation of state; by default the full
+        equation of state is used.
+
+    U_ref : optional float
+        Precomputed internal energy of the reference mineral at the
+        reference conditions [J/mol]. Supplying both U_ref and V_ref
+        skips the reference set_state, which is worthwhile when
+        hugoniot is called repeatedly with a fixed reference state,
+        e.g. when fitting the target mineral's parameters to shock
+        data.
+
+    V_ref : optional float
+        Precomputed volume of the reference mineral at the reference
+        conditions [m^3/mol]. See U_ref.
+
     Returns
     -------
     temperatures : numpy array of floats
         The Hugoniot temperatures at pressure
 
     volumes : numpy array of floats
-        The Hugoniot volumes at pressure
+        The Hugoniot volumes at pressure, taken from the same
+        property evaluations as the converged temperatures (no
+        separate post-convergence EOS pass is made)
     """
 
-    def Ediff(T, mineral, P, P_ref, U_ref, V_ref):
-        mineral.set_state(P, T[0])
-        U = mineral.helmholtz + T[0] * mineral.S
-        V = mineral.V
-
-        return (U - U_ref) - 0.5 * (P - P_ref) * (V_ref - V)
-
-    if reference_mineral is None:
-        reference_mineral = mineral
+    if U_ref is None or V_ref is None:
+        if reference_mineral is None:
+            reference_mineral = mineral
 
-    reference_mineral.set_state(P_ref, T_ref)
-    U_ref = reference_mineral.helmholtz + T_ref * reference_mineral.S
-    V_ref = reference_mineral.V
+        reference_mineral.set_state(P_ref, T_ref)
+        U_ref = reference_mineral.helmholtz + T_ref * reference_mineral.S
+        V_ref = reference_mineral.V
 
-    temperatures = np.empty_like(pressures)
-    volumes = np.empty_like(pressures)
+    pressures = np.asarray(pressures, dtype=float)
+    temperatures, volumes, unconverged = _hugoniot_newton(
+        mineral, pressures, T_ref, P_ref, U_ref, V_ref, property_table=property_table
+    )
 
-    for i, P in enumerate(pressures):
-        temperatures[i] = fsolve(
-            Ediff, [T_ref], args=(mineral, P, P_ref, U_ref, V_ref)
-        )[0]
-        volumes[i] = mineral.V
+    if len(unconverged) > 0:
+        temperatures, volumes = _hugoniot_fallback(
+            mineral,
+            pressures,
+            temperatures,
+            volumes,
+            unconverged,
+            T_ref,
+            P_ref,
+            U_ref,
+            V_ref,
+        )
 
     return temperatures, volumes
 
@@ -14,16 +14,20 @@ from __future__ import absolute_import
 import re
 import numpy as np
 from fractions import Fraction
-from collections import Counter
+from functools import lru_cache
+from collections import Counter, namedtuple
 import pkgutil
 from string import ascii_uppercase as ucase
 from sympy import nsimplify
 
 
+@lru_cache(maxsize=None)
 def read_masses():
     """
     A simple function to read a file with a two column list of
-    elements and their masses into a dictionary
+    elements and their masses into a dictionary.
+    The file is only parsed once; later calls (e.g. from modules
+    which build their own mass dictionaries) reuse the same result.
     """
     datastream = pkgutil.get_data("burnman", "data/input_masses/atomic_masses.dat")
     datalines = [
@@ -171,6 +175,47 @@ IUPAC_element_order = [
 ]  # Group 17
 
 
+_element_chunks = re.compile("[A-Z][^A-Z]*")
+_element_amounts = re.compile("[0-9][^A-Z]*")
+_site_chunks = re.compile(
+    r"\[(?P<occupancy>[^\]]*)\](?P<multiplicity>[0-9][^A-Z\[]*)?(?P<after>[^\[]*)"
+)
+_species_chunks = re.compile(r"(?P<species>[A-Z][a-z]*)(?P<amount>[0-9][^A-Z]*)?")
+
+
+def _parse_amount(string):
+    """
+    Converts an amount string from a formula into a float,
+    only paying for Fraction parsing when the string is
+    actually rational (e.g. "1/2").
+    """
+    if "/" in string:
+        return float(Fraction(string))
+    return float(string)
+
+
+@lru_cache(maxsize=None)
+def _dictionarize_formula_cached(formula):
+    """
+    Parses a chemical formula string into an immutable tuple of
+    (element, n_atoms) pairs. The same endmember formulae are parsed
+    over and over again by functions such as chemical_potentials,
+    so the results are memoized on the formula string.
+    """
+    f = dict()
+    elements = _element_chunks.findall(formula)
+    for element in elements:
+        element_name = _element_amounts.split(element)[0]
+        element_atoms = _element_amounts.findall(element)
+        if len(element_atoms) == 0:
+            element_atoms = 1.0
+        else:
+            element_atoms = _parse_amount(element_atoms[0])
+        f[element_name] = f.get(element_name, 0.0) + element_atoms
+
+    return tuple(f.items())
+
+
 def dictionarize_formula(formula):
     """
     A function to read a chemical formula string and
@@ -187,18 +232,7 @@ def dictionarize_formula(formula):
     f : dictionary object
         The same chemical formula, but expressed as a dictionary.
     """
-    f = dict()
-    elements = re.findall("[A-Z][^A-Z]*", formula)
-    for element in elements:
-        element_name = re.split("[0-9][^A-Z]*", element)[0]
-        element_atoms = re.findall("[0-9][^A-Z]*", element)
-        if len(element_atoms) == 0:
-            element_atoms = Fraction(1.0)
-        else:
-            element_atoms = Fraction(element_atoms[0])
-        f[element_name] = f.get(element_name, 0.0) + element_atoms
-
-    return f
+    return dict(_dictionarize_formula_cached(formula))
 
 
 def sum_formulae(formulae, amounts=None):
@@ -222,17 +256,34 @@ def sum_formulae(formulae, amounts=None):
     else:
         assert len(formulae) == len(amounts)
 
-    summed_formula = Counter()
-    for i, formula in enumerate(formulae):
-        summed_formula.update(
-            Counter(
-                {
-                    element: amounts[i] * n_atoms
-                    for (element, n_atoms) in formula.items()
-                }
+    summed_formula = {}
+    for amount, formula in zip(amounts, formulae):
+        for element, n_atoms in formula.items():
+            summed_formula[element] = (
+                summed_formula.get(element, 0.0) + amount * n_atoms
             )
-        )
-    return summed_formula
+    return Counter(summed_formula)
+
+
+"""
+element_index maps each element in IUPAC_element_order to its
+position in that list, and mass_vector holds the corresponding
+atomic masses, allowing mass computations over compositional
+arrays to be expressed as a single matrix-vector product.
+"""
+element_index = {e: i for i, e in enumerate(IUPAC_element_order)}
+mass_vector = np.array([atomic_masses.get(e, 0.0) for e in IUPAC_element_order])
+_max_element_rank = len(IUPAC_element_order)
+
+
+@lru_cache(maxsize=None)
+def _formula_mass_cached(formula_items):
+    """
+    Computes the formula mass from a frozenset of
+    (element, n_atoms) pairs, memoizing the result.
+    """
+    mass = sum(n_atoms * atomic_masses[element] for element, n_atoms in formula_items)
+    return mass
 
 
 def formula_mass(formula):
@@ -249,8 +300,37 @@ def formula_mass(formula):
     mass : float
         The mass per mole of formula
     """
-    mass = sum(formula[element] * atomic_masses[element] for element in formula)
-    return mass
+    return _formula_mass_cached(frozenset(formula.items()))
+
+
+def formula_masses_batch(formula_array, elements):
+    """
+    Computes the formula masses of a set of compositions
+    in compositional array form in a single vectorized operation.
+
+    Parameters
+    ----------
+    formula_array : 2D array of floats
+        Array of formulae, with one row per formula and
+        one column per element (as output by compositional_array
+        or ordered_compositional_array)
+
+    elements : list of strings
+        List of elements corresponding to the columns of formula_array
+
+    Returns
+    -------
+    masses : 1D numpy array of floats
+        The mass per mole of each formula
+    """
+    formula_array = np.asarray(formula_array)
+    try:
+        indices = [element_index[e] for e in elements]
+    except KeyError:
+        # entities in the mass table but outside the IUPAC element
+        # ordering (e.g. vacancies, 'Vc') take the general path
+        return formula_array @ np.array([atomic_masses[e] for e in elements])
+    return formula_array @ mass_vector[indices]
 
 
 def convert_formula(formula, to_type="mass", normalize=False):
@@ -292,7 +372,7 @@ def convert_formula(formula, to_type="mass", normalize=False):
         )
 
     if normalize:
-        s = np.sum([n for (element, n) in f.items()])
+        s = sum(f.values())
         f = {element: n / s for (element, n) in f.items()}
 
     return f
@@ -373,36 +453,29 @@ def process_solution_chemistry(solution_model):
 
     solution_formulae = [{} for i in range(n_endmembers)]
     sites = [[] for i in range(n_sites)]
-    list_occupancies = []
+    site_species_indices = [{} for i in range(n_sites)]
+    occupancies_dict = {}
     list_multiplicities = np.empty(shape=(n_endmembers, n_sites))
-    n_occupancies = 0
 
-    # Number of unique site occupancies (e.g.. Mg on X etc.)
+    # First pass: discover the species on each site and record
+    # the proportion of each species on each site of each endmember.
+    # A single compiled regex yields the occupancy string, site
+    # multiplicity and any trailing elements for each site in turn.
     for i_mbr in range(n_endmembers):
-        list_occupancies.append([[0] * len(sites[site]) for site in range(n_sites)])
-        s = re.split(r"\[", formulae[i_mbr])[1:]
-
-        for i_site, site_string in enumerate(s):
-            site_split = re.split(r"\]", site_string)
-            site_occupancy = site_split[0]
-
-            mult = re.split("[A-Z][^A-Z]*", site_split[1])[0]
-            if mult == "":
-                list_multiplicities[i_mbr][i_site] = Fraction(1.0)
+        for i_site, site in enumerate(_site_chunks.finditer(formulae[i_mbr])):
+            mult = site["multiplicity"]
+            if mult is None:
+                list_multiplicities[i_mbr][i_site] = 1.0
             else:
-                list_multiplicities[i_mbr][i_site] = Fraction(mult)
+                list_multiplicities[i_mbr][i_site] = _parse_amount(mult)
 
             # Loop over species on a site
-            species = re.findall("[A-Z][^A-Z]*", site_occupancy)
-
-            for sp in species:
-                # Find the species and its proportion on the site
-                species_split = re.split("([0-9][^A-Z]*)", sp)
-                name_of_species = species_split[0]
-                if len(species_split) == 1:
-                    proportion_species_on_site = Fraction(1.0)
+            for sp in _species_chunks.finditer(site["occupancy"]):
+                name_of_species = sp["species"]
+                if sp["amount"] is None:
+                    proportion_species_on_site = 1.0
                 else:
-                    proportion_species_on_site = Fraction(species_split[1])
+                    proportion_species_on_site = _parse_amount(sp["amount"])
 
                 solution_formulae[i_mbr][name_of_species] = solution_formulae[
                     i_mbr
@@ -410,46 +483,36 @@ def process_solution_chemistry(solution_model):
                     list_multiplicities[i_mbr][i_site] * proportion_species_on_site
                 )
 
-                if name_of_species not in sites[i_site]:
-                    n_occupancies += 1
+                if name_of_species not in site_species_indices[i_site]:
+                    site_species_indices[i_site][name_of_species] = len(sites[i_site])
                     sites[i_site].append(name_of_species)
-                    i_el = sites[i_site].index(name_of_species)
-                    for parsed_mbr in range(len(list_occupancies)):
-                        list_occupancies[parsed_mbr][i_site].append(0)
+                occupancies_dict[(i_mbr, i_site, name_of_species)] = (
+                    proportion_species_on_site
+                )
+
+            # Loop over elements after the site
+            for el in _species_chunks.finditer(site["after"]):
+                if el["amount"] is None:
+                    nel = 1.0
                 else:
-                    i_el = sites[i_site].index(name_of_species)
-                list_occupancies[i_mbr][i_site][i_el] = proportion_species_on_site
-
-            # Loop over species after site
-            if len(site_split) != 1:
-                not_in_site = str(filter(None, site_split[1]))
-                not_in_site = not_in_site.replace(mult, "", 1)
-                for enamenumber in re.findall("[A-Z][^A-Z]*", not_in_site):
-                    sp = list(filter(None, re.split(r"(\d+)", enamenumber)))
-                    # Look up number of atoms of element
-                    if len(sp) == 1:
-                        nel = 1.0
-                    else:
-                        nel = float(float(sp[1]))
-                    solution_formulae[i_mbr][sp[0]] = (
-                        solution_formulae[i_mbr].get(sp[0], 0.0) + nel
-                    )
-
-    # Site occupancies and multiplicities
-    endmember_occupancies = np.empty(shape=(n_endmembers, n_occupancies))
-    site_multiplicities = np.empty(shape=(n_endmembers, n_occupancies))
+                    nel = _parse_amount(el["amount"])
+                solution_formulae[i_mbr][el["species"]] = (
+                    solution_formulae[i_mbr].get(el["species"], 0.0) + nel
+                )
 
-    for i_mbr in range(n_endmembers):
-        n_species = 0
-        for i_site in range(n_sites):
-            for i_el in range(len(list_occupancies[i_mbr][i_site])):
-                endmember_occupancies[i_mbr][n_species] = list_occupancies[i_mbr][
-                    i_site
-                ][i_el]
-                site_multiplicities[i_mbr][n_species] = list_multiplicities[i_mbr][
-                    i_site
-                ]
-                n_species += 1
+    # Second pass: scatter the proportions into pre-allocated arrays,
+    # now that the full set of site species is known.
+    n_species_per_site = [len(site) for site in sites]
+    n_occupancies = sum(n_species_per_site)
+    site_offsets = np.cumsum([0] + n_species_per_site)
+
+    endmember_occupancies = np.zeros(shape=(n_endmembers, n_occupancies))
+    for (i_mbr, i_site, name_of_species), proportion in occupancies_dict.items():
+        i_el = site_species_indices[i_site][name_of_species]
+        endmember_occupancies[i_mbr][site_offsets[i_site] + i_el] = proportion
+
+    # The multiplicities are repeated for each species on each site
+    site_multiplicities = np.repeat(list_multiplicities, n_species_per_site, axis=1)
 
     # Site names
     solution_model.site_names = []
@@ -464,9 +527,7 @@ def process_solution_chemistry(solution_model):
     solution_model.site_multiplicities = site_multiplicities
     solution_model.n_occupancies = n_occupancies
     solution_model.endmember_occupancies = endmember_occupancies
-    solution_model.endmember_noccupancies = np.einsum(
-        "ij, ij->ij", endmember_occupancies, site_multiplicities
-    )
+    solution_model.endmember_noccupancies = endmember_occupancies * site_multiplicities
 
 
 def site_occupancies_to_strings(
@@ -529,9 +590,7 @@ def site_occupancies_to_strings(
                 "on a per-site basis or a per-species basis"
             )
 
-        site_multiplicities = np.einsum(
-            "i, j->ij", np.ones(n_endmembers), site_multiplicities
-        )
+        site_multiplicities = np.tile(site_multiplicities, (n_endmembers, 1))
     elif len(site_multiplicities.shape) == 2:
         if site_multiplicities.shape != endmember_occupancies.shape:
             raise Exception(
@@ -544,25 +603,55 @@ def site_occupancies_to_strings(
     else:
         raise Exception("Site multiplicities should either be 1D or 2D.")
 
+    # Normalize the occupancies on each site for all endmembers at once
+    # using a segmented sum over the per-site blocks of columns
+    site_lens = np.array([len(site) for site in site_species_names])
+    site_offsets = np.concatenate(([0], np.cumsum(site_lens)))
+    site_sums = np.add.reduceat(endmember_occupancies, site_offsets[:-1], axis=1)
+    occupancies = endmember_occupancies / np.repeat(site_sums, site_lens, axis=1)
+
     site_formulae = []
-    for i_mbr, mbr_occupancies in enumerate(endmember_occupancies):
-        i = 0
-        site_formulae.append("")
-        for site in site_species_names:
-            amounts = mbr_occupancies[i : i + len(site)]
-            mult = site_multiplicities[i_mbr, i]
-            if np.abs(mult - 1.0) < 1.0e-12:
+    for i_mbr in range(n_endmembers):
+        formula_parts = []
+        for i_site, site in enumerate(site_species_names):
+            amounts = occupancies[
+                i_mbr, site_offsets[i_site] : site_offsets[i_site + 1]
+            ]
+            mult = site_multiplicities[i_mbr, site_offsets[i_site]]
+            if abs(mult - 1.0) < 1.0e-12:
                 mult = ""
             else:
                 mult = str(nsimplify(mult))
-            amounts /= sum(amounts)
             site_occupancy = formula_to_string(dict(zip(site, amounts)))
-            site_formulae[-1] += "[{0}]{1}".format(site_occupancy, mult)
-            i += len(site)
+            formula_parts.append("[{0}]{1}".format(site_occupancy, mult))
+        site_formulae.append("".join(formula_parts))
 
     return site_formulae
 
 
+class FormulaeTable(namedtuple("FormulaeTable", ["matrix", "elements"])):
+    """
+    A dense structure-of-arrays representation of a set of
+    chemical formulae: a (n_formulae, n_elements) float matrix
+    and the list of elements labelling its columns.
+    Building this once per assemblage and reusing it allows
+    aggregations over formulae to be expressed as single numpy
+    operations rather than per-dictionary loops.
+
+    Instances unpack like the (formula_array, elements) tuples
+    returned by compositional_array.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_formulae(cls, formulae):
+        """
+        Builds a FormulaeTable from a list of formula dictionaries.
+        """
+        return cls(*compositional_array(formulae))
+
+
 def compositional_array(formulae):
     """
     Parameters
@@ -578,15 +667,17 @@ def compositional_array(formulae):
     elements : List of strings
         List of elements
     """
-    elements = []
+    # A dict preserves insertion order and gives O(1) membership tests
+    elements = {}
     for formula in formulae:
         for element in formula:
             if element not in elements:
-                elements.append(element)
+                elements[element] = None
+    elements = list(elements)
 
     formula_array = ordered_compositional_array(formulae, elements)
 
-    return formula_array, elements
+    return FormulaeTable(formula_array, elements)
 
 
 def ordered_compositional_array(formulae, elements):
@@ -604,11 +695,12 @@ def ordered_compositional_array(formulae, elements):
     formula_array : 2D array of floats
         Array of endmember formulae
     """
+    element_indices = {element: i for i, element in enumerate(elements)}
     formula_array = np.zeros(shape=(len(formulae), len(elements)))
     for idx, formula in enumerate(formulae):
-        for element in formula:
-            assert element in elements
-            formula_array[idx][elements.index(element)] = formula[element]
+        for element, n_atoms in formula.items():
+            assert element in element_indices
+            formula_array[idx][element_indices[element]] = n_atoms
 
     return formula_array
 
@@ -629,23 +721,22 @@ def formula_to_string(formula):
         in the periodic table, then they are added at the end of the string.
     """
 
-    formula_string = ""
-    for e in IUPAC_element_order:
-        if e in formula and np.abs(formula[e]) > 1.0e-12:
-            if np.abs(formula[e] - 1.0) < 1.0e-12:
-                formula_string += e
-            else:
-                formula_string += e + str(nsimplify(formula[e]))
+    # Sort the elements present into IUPAC order rather than scanning
+    # the whole element list; unrecognised keys sort to the end,
+    # keeping their insertion order.
+    items = sorted(
+        formula.items(), key=lambda kv: element_index.get(kv[0], _max_element_rank)
+    )
 
-    for e in formula:
-        if e not in IUPAC_element_order:
-            if e in formula and np.abs(formula[e]) > 1.0e-12:
-                if np.abs(formula[e] - 1.0) < 1.0e-12:
-                    formula_string += e
-                else:
-                    formula_string += e + str(nsimplify(formula[e]))
+    chunks = []
+    for e, n_atoms in items:
+        if abs(n_atoms) > 1.0e-12:
+            if abs(n_atoms - 1.0) < 1.0e-12:
+                chunks.append(e)
+            else:
+                chunks.append(e + str(nsimplify(n_atoms)))
 
-    return formula_string
+    return "".join(chunks)
 
 
 def sort_element_list_to_IUPAC_order(element_list):
@@ -660,7 +751,8 @@ def sort_element_list_to_IUPAC_order(element_list):
     sorted_list : list
         List of elements sorted into IUPAC order
     """
-    sorted_list = [e for e in IUPAC_element_order if e in element_list]
+    element_set = frozenset(element_list)
+    sorted_list = [e for e in IUPAC_element_order if e in element_set]
     assert len(sorted_list) == len(element_list)
     return sorted_list
 
@@ -702,49 +794,37 @@ def convert_fractions(composite, phase_fractions, input_type, output_type):
                 + ".set_state(P, T) has not been called, so volume fractions are currently undefined. Exiting."
             )
 
+    n_phases = len(composite.phases)
+    fractions = np.asarray(phase_fractions, dtype=float)
+
+    if input_type == "volume" or output_type == "volume":
+        molar_volumes = np.fromiter(
+            (phase.molar_volume for phase in composite.phases), float, count=n_phases
+        )
+    if input_type == "mass" or output_type == "mass":
+        molar_masses = np.fromiter(
+            (phase.molar_mass for phase in composite.phases), float, count=n_phases
+        )
+
     if input_type == "molar":
-        molar_fractions = phase_fractions
+        molar_fractions = fractions
     if input_type == "volume":
-        total_moles = sum(
-            volume_fraction / phase.molar_volume
-            for volume_fraction, phase in zip(phase_fractions, composite.phases)
-        )
-        molar_fractions = [
-            volume_fraction / (phase.molar_volume * total_moles)
-            for volume_fraction, phase in zip(phase_fractions, composite.phases)
-        ]
+        molar_fractions = fractions / molar_volumes
+        molar_fractions /= molar_fractions.sum()
     if input_type == "mass":
-        total_moles = sum(
-            mass_fraction / phase.molar_mass
-            for mass_fraction, phase in zip(phase_fractions, composite.phases)
-        )
-        molar_fractions = [
-            mass_fraction / (phase.molar_mass * total_moles)
-            for mass_fraction, phase in zip(phase_fractions, composite.phases)
-        ]
+        molar_fractions = fractions / molar_masses
+        molar_fractions /= molar_fractions.sum()
 
     if output_type == "volume":
-        total_volume = sum(
-            molar_fraction * phase.molar_volume
-            for molar_fraction, phase in zip(molar_fractions, composite.phases)
-        )
-        output_fractions = [
-            molar_fraction * phase.molar_volume / total_volume
-            for molar_fraction, phase in zip(molar_fractions, composite.phases)
-        ]
+        output_fractions = molar_fractions * molar_volumes
+        output_fractions /= output_fractions.sum()
     elif output_type == "mass":
-        total_mass = sum(
-            molar_fraction * phase.molar_mass
-            for molar_fraction, phase in zip(molar_fractions, composite.phases)
-        )
-        output_fractions = [
-            molar_fraction * phase.molar_mass / total_mass
-            for molar_fraction, phase in zip(molar_fractions, composite.phases)
-        ]
+        output_fractions = molar_fractions * molar_masses
+        output_fractions /= output_fractions.sum()
     elif output_type == "molar":
         output_fractions = molar_fractions
 
-    return output_fractions
+    return output_fractions.tolist()
 
 
 def reaction_matrix_as_strings(reaction_matrix, compound_names):
@@ -2,12 +2,11 @@
 from __future__ import absolute_import
 from __future__ import print_function
 
+import ast
 import os
 import sys
 import re
 
-sys.path.insert(1, os.path.abspath("../examples"))
-
 # order the examples sensibly:
 ordered_examples = [
     "example_mineral.py",
@@ -42,14 +41,20 @@ ordered_examples = [
 ]
 
 for ex in ordered_examples:
-    # print "*",ex
-    print(__import__(ex.replace(".py", "")).__doc__)
+    # Parse the module docstring straight from the source rather than
+    # importing the example, which would pull in the full scientific
+    # stack and execute any unguarded example code.
+    with open(os.path.join("../examples", ex)) as f:
+        print(ast.get_docstring(ast.parse(f.read())))
 
 
 # check we do not forget an example
+_example_pattern = re.compile(r"^example.*\.py$")
+_ordered_set = frozenset(ordered_examples)
+
 all = os.listdir("../examples/")
-examples = list(filter(lambda k: re.match("^example(.*)\.py$", k), all))
-not_listed = list(filter(lambda x: (x not in ordered_examples), examples))
+examples = [k for k in all if _example_pattern.match(k)]
+not_listed = [x for x in examples if x not in _ordered_set]
 
 sys.stderr.write(
     "The following examples are not included "